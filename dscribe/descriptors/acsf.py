@@ -13,8 +13,6 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-import sys
-
 import numpy as np
 
 from scipy.sparse import coo_matrix
@@ -24,8 +22,15 @@ from dscribe.core import System
 
 from ase import Atoms
 
-from dscribe.libacsf.acsfwrapper import ACSFWrapper
+try:
+    from dscribe.libacsf.acsfwrapper import ACSFWrapper
+except ImportError:
+    # If the compiled extension is not available, e.g. when prototyping from
+    # a source checkout without building, fall back to the slower pure numpy
+    # implementation with an identical interface.
+    from dscribe.libacsf.acsffallback import ACSFWrapper
 import dscribe.utils.geometry
+import dscribe.utils.memory
 
 
 class ACSF(Descriptor):
@@ -171,6 +176,17 @@ class ACSF(Descriptor):
         # Transform the input system into the internal System-object
         system = self.get_system(system)
 
+        # The positions and atomic numbers are read through Atoms.arrays
+        # throughout this function: the ASE accessors return a defensive copy
+        # on every call, whereas the stored arrays can be shared directly as
+        # they are never modified here.
+
+        # Check that the system does not contain types that have not been
+        # declared. The check is done before any computation: the C++ kernel
+        # resolves the types through a plain lookup table and assumes that
+        # all atomic numbers in the system are valid.
+        self.check_atomic_numbers(system.arrays["numbers"])
+
         # Create C-compatible list of atomic indices for which the ACSF is
         # calculated
         calculate_all = False
@@ -185,11 +201,14 @@ class ACSF(Descriptor):
         # actually slower for this case.
         if calculate_all and not self.periodic:
             n_atoms = len(system)
-            all_pos = system.get_positions()
+            all_pos = system.arrays["positions"]
             dmat = dscribe.utils.geometry.get_adjacency_matrix(self.rcut, all_pos, all_pos)
         # Otherwise the amount of pairwise distances that are calculated is
-        # kept at minimum. Only distances for the given indices (and possibly
-        # the secondary neighbours if G4 is specified) are calculated.
+        # kept at minimum. Only the neighbours of the given indices are
+        # searched: the C++ kernel reads just the neighbour lists of the
+        # centers and computes all pair and triplet distances, including the
+        # neighbour-neighbour ones needed by G4, on the fly from the
+        # positions.
         else:
             # Create the extended system if periodicity is requested. For ACSF only
             # the distance from central atom needs to be considered in extending
@@ -197,49 +216,43 @@ class ACSF(Descriptor):
             if self.periodic:
                 system = dscribe.utils.geometry.get_extended_system(system, self.rcut, return_cell_indices=False)
 
-            # First calculate distances from specified centers to all other
-            # atoms. This is already enough for everything else except G4.
+            # Calculate the neighbours of the specified centers
             n_atoms = len(system)
-            all_pos = system.get_positions()
+            all_pos = system.arrays["positions"]
             central_pos = all_pos[indices]
             dmat_primary = dscribe.utils.geometry.get_adjacency_matrix(self.rcut, central_pos, all_pos)
 
-            # Create symmetric full matrix
+            # Fix the row numbering to refer to the original system
             col = dmat_primary.col
-            row = [indices[x] for x in dmat_primary.row]  # Fix row numbering to refer to original system
+            row = [indices[x] for x in dmat_primary.row]
             data = dmat_primary.data
             dmat = coo_matrix((data, (row, col)), shape=(n_atoms, n_atoms))
-            dmat_lil = dmat.tolil()
-            dmat_lil[col, row] = dmat_lil[row, col]
-
-            # If G4 terms are requested, calculate also secondary neighbour distances
-            if len(self.g4_params) != 0:
-                neighbour_indices = np.unique(col)
-                neigh_pos = all_pos[neighbour_indices]
-                dmat_secondary = dscribe.utils.geometry.get_adjacency_matrix(self.rcut, neigh_pos, neigh_pos)
-                col = [neighbour_indices[x] for x in dmat_secondary.col]  # Fix col numbering to refer to original system
-                row = [neighbour_indices[x] for x in dmat_secondary.row]  # Fix row numbering to refer to original system
-                dmat_lil[row, col] = np.array(dmat_secondary.data)
-
-            dmat = dmat_lil.tocoo()
-
-        # Get adjancency list and full dense adjancency matrix
-        neighbours = dscribe.utils.geometry.get_adjacency_list(dmat)
-        dmat_dense = np.full((n_atoms, n_atoms), sys.float_info.max)  # The non-neighbor values are treated as "infinitely far".
-        dmat_dense[dmat.col, dmat.row] = dmat.data
-
-        # Calculate ACSF with C++
+
+        # The neighbours are passed in compressed sparse row form: the index
+        # arrays of the CSR matrix can be shared with C++ directly, unlike a
+        # Python adjacency list which would be converted element by element.
+        # A dense distance matrix is not needed either: the C++ kernel
+        # computes the pair distances on the fly from the positions, which
+        # avoids allocating and filling an O(n_atoms^2) array for entries
+        # that are mostly outside the cutoff.
+        dmat_csr = dmat.tocsr()
+        nbr_indices = np.ascontiguousarray(dmat_csr.indices, dtype=np.int32)
+        nbr_indptr = np.ascontiguousarray(dmat_csr.indptr, dtype=np.int32)
+
+        # Calculate ACSF with C++. The positions are passed in transposed
+        # (3, n_atoms) form so that the kernel sees each cartesian component
+        # as a contiguous array. The buffer starts on a cache-line boundary,
+        # which the kernel asserts to the compiler.
+        positions_soa = dscribe.utils.memory.aligned_empty((3, n_atoms), dtype=np.float32)
+        positions_soa[...] = all_pos.T
         output = self.acsf_wrapper.create(
-            system.get_positions(),
-            system.get_atomic_numbers(),
-            dmat_dense,
-            neighbours,
-            indices,
+            positions_soa,
+            np.ascontiguousarray(system.arrays["numbers"], dtype=np.int32),
+            nbr_indices,
+            nbr_indptr,
+            np.ascontiguousarray(indices, dtype=np.int32),
         )
 
-        # Check if there are types that have not been declared
-        self.check_atomic_numbers(system.get_atomic_numbers())
-
         # Return sparse matrix if requested
         if self._sparse:
             output = coo_matrix(output)
@@ -307,14 +320,16 @@ class ACSF(Descriptor):
             value = []
         else:
             # Check dimensions
-            value = np.array(value, dtype=np.float)
+            value = np.array(value, dtype=np.float32)
             if value.ndim != 2:
                 raise ValueError("g2_params should be a matrix with two columns (eta, Rs).")
             if value.shape[1] != 2:
                 raise ValueError("g2_params should be a matrix with two columns (eta, Rs).")
 
-            # Check that etas are positive
-            if np.any(value[:, 0] <= 0) is True:
+            # Check that etas are positive. Note that np.any() returns a
+            # numpy boolean: comparing it against the True singleton with
+            # "is" never matches, which had silently disabled this check.
+            if np.any(value[:, 0] <= 0):
                 raise ValueError("G2 eta parameters should be positive numbers.")
 
         self.acsf_wrapper.g2_params = value
@@ -336,7 +351,7 @@ class ACSF(Descriptor):
             value = []
         else:
             # Check dimensions
-            value = np.array(value, dtype=np.float)
+            value = np.array(value, dtype=np.float32)
             if value.ndim != 1:
                 raise ValueError("g3_params should be a vector.")
 
@@ -359,14 +374,15 @@ class ACSF(Descriptor):
             value = []
         else:
             # Check dimensions
-            value = np.array(value, dtype=np.float)
+            value = np.array(value, dtype=np.float32)
             if value.ndim != 2:
                 raise ValueError("g4_params should be a matrix with three columns (eta, zeta, lambda).")
             if value.shape[1] != 3:
                 raise ValueError("g4_params should be a matrix with three columns (eta, zeta, lambda).")
 
-            # Check that etas are positive
-            if np.any(value[:, 2] <= 0) is True:
+            # Check that etas are positive. The eta values are in the first
+            # column; lambda in the last column is commonly negative.
+            if np.any(value[:, 0] <= 0):
                 raise ValueError("3-body G4 eta parameters should be positive numbers.")
 
         self.acsf_wrapper.g4_params = value
@@ -388,14 +404,15 @@ class ACSF(Descriptor):
             value = []
         else:
             # Check dimensions
-            value = np.array(value, dtype=np.float)
+            value = np.array(value, dtype=np.float32)
             if value.ndim != 2:
                 raise ValueError("g5_params should be a matrix with three columns (eta, zeta, lambda).")
             if value.shape[1] != 3:
                 raise ValueError("g5_params should be a matrix with three columns (eta, zeta, lambda).")
 
-            # Check that etas are positive
-            if np.any(value[:, 2] <= 0) is True:
+            # Check that etas are positive. The eta values are in the first
+            # column; lambda in the last column is commonly negative.
+            if np.any(value[:, 0] <= 0):
                 raise ValueError("3-body G5 eta parameters should be positive numbers.")
 
         self.acsf_wrapper.g5_params = value
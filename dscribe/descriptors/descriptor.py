@@ -142,6 +142,13 @@ class Descriptor(ABC):
         self._atomic_number_set = set(self._atomic_numbers)
         self._species = species
 
+        # A boolean lookup table of the allowed atomic numbers is precomputed
+        # here so that validating the atomic numbers of a system becomes a
+        # single vectorized table lookup instead of per-call set operations.
+        mask = np.zeros(max(atomic_numbers, default=0) + 1, dtype=np.bool_)
+        mask[atomic_numbers] = True
+        self._atomic_number_mask = mask
+
     def check_atomic_numbers(self, atomic_numbers):
         """Used to check that the given atomic numbers have been defined for
         this descriptor.
@@ -154,13 +161,24 @@ class Descriptor(ABC):
             included in the species given to this descriptor.
         """
         # Check that the system does not have elements that are not in the list
-        # of atomic numbers
-        zs = set(atomic_numbers)
-        if not zs.issubset(self._atomic_number_set):
+        # of atomic numbers. The check is done against a precomputed lookup
+        # table to avoid creating any intermediate sets or arrays. Sets are
+        # materialized first, as np.asarray() does not consume them.
+        if isinstance(atomic_numbers, set):
+            atomic_numbers = list(atomic_numbers)
+        zs = np.asarray(atomic_numbers)
+        mask = self._atomic_number_mask
+        # Only atomic numbers within the table bounds may be used to index
+        # it: anything outside, including negative values that would wrap
+        # around, is invalid by definition.
+        in_range = (zs >= 0) & (zs < mask.size)
+        valid = in_range.copy()
+        valid[in_range] = mask[zs[in_range].astype(np.intp)]
+        if not valid.all():
             raise ValueError(
                 "The following atomic numbers are not defined "
                 "for this descriptor: {}"
-                .format(zs.difference(self._atomic_number_set))
+                .format(set(zs[~valid]))
             )
 
     def create_parallel(self, inp, func, n_jobs, output_sizes=None, verbose=False, prefer="processes"):
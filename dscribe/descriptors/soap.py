@@ -666,9 +666,11 @@ class SOAP(Descriptor):
         positions, Z_sorted, n_species, atomtype_lst = self.flatten_positions(system, atomic_numbers)
         centers = np.array(centers)
         n_centers = centers.shape[0]
-        centers = centers.flatten()
-        alphas = alphas.flatten()
-        betas = betas.flatten()
+        # ravel() returns a view for these contiguous arrays, whereas
+        # flatten() would copy them on every call
+        centers = centers.ravel()
+        alphas = alphas.ravel()
+        betas = betas.ravel()
 
         # Determine shape
         if crossover:
@@ -717,8 +719,8 @@ class SOAP(Descriptor):
         centers = np.array(centers)
         n_centers = centers.shape[0]
 
-        # Flatten arrays
-        gss = gss.flatten()
+        # Flatten arrays. ravel() avoids copying the contiguous basis data.
+        gss = gss.ravel()
 
         # Determine shape
         if crossover:
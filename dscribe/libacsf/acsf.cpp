@@ -27,12 +27,23 @@ ACSF::ACSF(float rCut, vector<vector<float> > g2Params, vector<float> g3Params,
 void ACSF::setRCut(float rCut)
 {
     this->rCut = rCut;
+
+    // The scaling factor of the cutoff function only changes when the cutoff
+    // radius does, so it is precomputed here to keep the division out of the
+    // per-pair evaluation.
+    this->piOverRCut = PI/rCut;
 }
 
 void ACSF::setG2Params(vector<vector<float> > g2Params)
 {
     this->g2Params = g2Params;
     nG2 = g2Params.size();
+    g2Eta.resize(nG2);
+    g2Rs.resize(nG2);
+    for (int i = 0; i < nG2; ++i) {
+        g2Eta[i] = g2Params[i][0];
+        g2Rs[i] = g2Params[i][1];
+    }
 }
 
 void ACSF::setG3Params(vector<float> g3Params)
@@ -45,12 +56,28 @@ void ACSF::setG4Params(vector<vector<float> > g4Params)
 {
     this->g4Params = g4Params;
     nG4 = g4Params.size();
+    g4Eta.resize(nG4);
+    g4Zeta.resize(nG4);
+    g4Lambda.resize(nG4);
+    for (int i = 0; i < nG4; ++i) {
+        g4Eta[i] = g4Params[i][0];
+        g4Zeta[i] = g4Params[i][1];
+        g4Lambda[i] = g4Params[i][2];
+    }
 }
 
 void ACSF::setG5Params(vector<vector<float> > g5Params)
 {
     this->g5Params = g5Params;
     nG5 = g5Params.size();
+    g5Eta.resize(nG5);
+    g5Zeta.resize(nG5);
+    g5Lambda.resize(nG5);
+    for (int i = 0; i < nG5; ++i) {
+        g5Eta[i] = g5Params[i][0];
+        g5Zeta[i] = g5Params[i][1];
+        g5Lambda[i] = g5Params[i][2];
+    }
 }
 
 void ACSF::setAtomicNumbers(vector<int> atomicNumbers)
@@ -58,38 +85,94 @@ void ACSF::setAtomicNumbers(vector<int> atomicNumbers)
     this->atomicNumbers = atomicNumbers;
     nTypes = atomicNumbers.size();
     nTypePairs = nTypes*(nTypes+1)/2;
-    unordered_map<int, int> atomicNumberToIndexMap;
-    int i = 0;
+    int maxZ = 0;
+    for (int Z : atomicNumbers) {
+        maxZ = max(maxZ, Z);
+    }
+    vector<signed char> atomicNumberToIndexMap(maxZ+1, -1);
+    signed char i = 0;
     for (int Z : atomicNumbers) {
         atomicNumberToIndexMap[Z] = i;
         ++i;
     }
     this->atomicNumberToIndexMap = atomicNumberToIndexMap;
+
+    // Tabulate the triangular index of every unordered pair of types so
+    // that the triplet loop can resolve it with one load instead of the
+    // index arithmetic and the ordering branch.
+    vector<short> typePairToIndexMap(nTypes*nTypes);
+    for (int a = 0; a < nTypes; ++a) {
+        for (int b = 0; b < nTypes; ++b) {
+            int hi = max(a, b);
+            int lo = min(a, b);
+            typePairToIndexMap[a*nTypes + b] = (hi*(hi+1))/2 + lo;
+        }
+    }
+    this->typePairToIndexMap = typePairToIndexMap;
 }
 
-vector<vector<float> > ACSF::create(vector<vector<float> > &positions, vector<int> &atomicNumbers, const vector<vector<float> > &distances, const vector<vector<int> > &neighbours, vector<int> &indices)
+void ACSF::create(float *out, const float *positions, int nAtoms, const int *atomicNumbers, const int *nbrIndices, const int *nbrIndptr, const int *indices, int nIndices)
 {
-    // Allocate memory
-    int nIndices = indices.size();
-    vector<vector<float> > output(nIndices, vector<float>((1+nG2+nG3)*nTypes+(nG4+nG5)*nTypePairs, 0));
+    // The caller allocates both buffers on 64-byte boundaries (see
+    // dscribe.utils.memory). Asserting that to the compiler lets it emit
+    // aligned loads where the alignment can be tracked. Only the buffer
+    // bases are guaranteed: the y and z component streams and the
+    // individual output rows start at arbitrary offsets within the buffers.
+#if defined(__GNUC__)
+    positions = static_cast<const float *>(__builtin_assume_aligned(positions, 64));
+    out = static_cast<float *>(__builtin_assume_aligned(out, 64));
+#endif
+
+    // The positions are given in transposed (3, nAtoms) form so that each
+    // cartesian component is a contiguous stream that vectorizes well. The
+    // pair distances are computed on the fly from these streams: the
+    // neighbour list already restricts the pairs to the cutoff radius, so a
+    // full distance matrix would mostly contain unused entries.
+    const float *posX = positions;
+    const float *posY = positions + nAtoms;
+    const float *posZ = positions + 2*nAtoms;
+
+    // The output is accumulated directly into the zero-initialized buffer
+    // given by the caller. This way no intermediate results need to be
+    // allocated and copied on each call.
+    //
+    // The configuration is fixed for the duration of the call, so the sizes
+    // read from the object are hoisted into local constants here: this lets
+    // the compiler treat them as loop invariants in the pair and triplet
+    // loops instead of reloading them through the this-pointer.
+    const int nTypes = this->nTypes;
+    const int nRadial = 1+nG2+nG3;
+    const int nAngular = nG4+nG5;
+    const int nFeatures = nRadial*nTypes+nAngular*nTypePairs;
+    const int angularStart = nTypes*nRadial;
+    const bool hasAngular = nAngular != 0;
+    const short *pairIndex = typePairToIndexMap.data();
 
-    // Calculate the symmetry function values for every specified atom
-    int index = 0;
-    for (int &i : indices) {
+    // Calculate the symmetry function values for every specified atom. The
+    // neighbours are given in compressed sparse row form: the neighbours of
+    // atom i are nbrIndices[nbrIndptr[i]:nbrIndptr[i+1]].
+    for (int index = 0; index < nIndices; ++index) {
+        int i = indices[index];
 
         // Compute pairwise terms only for neighbors within cutoff
-        const vector<int> &i_neighbours = neighbours[i];
-        vector<float> &row = output[index];
-        for (const int &j : i_neighbours) {
+        float *row = out + index*nFeatures;
+        float xi = posX[i];
+        float yi = posY[i];
+        float zi = posZ[i];
+        for (int jn = nbrIndptr[i]; jn < nbrIndptr[i+1]; ++jn) {
+            int j = nbrIndices[jn];
             if (i == j) {
                 continue;
             }
 
             // Precompute some values
-            float r_ij = distances[i][j];
+            float dx_ij = xi - posX[j];
+            float dy_ij = yi - posY[j];
+            float dz_ij = zi - posZ[j];
+            float r_ij = sqrt(dx_ij*dx_ij + dy_ij*dy_ij + dz_ij*dz_ij);
             float fc_ij = computeCutoff(r_ij);
             int index_j = atomicNumberToIndexMap[atomicNumbers[j]];
-            int offset = index_j * (1+nG2+nG3);  // Skip G1, G2, G3 types that are not the ones of atom bi
+            int offset = index_j * nRadial;  // Skip G1, G2, G3 types that are not the ones of atom bi
 
             // Compute G1
             computeG1(row, offset, fc_ij);
@@ -101,15 +184,22 @@ vector<vector<float> > ACSF::create(vector<vector<float> > &positions, vector<in
             computeG3(row, offset, r_ij, fc_ij);
 
             // Compute angle terms only when both neighbors are within cutoff
-            if (g4Params.size() != 0 || g5Params.size() != 0) {
-                for (const int &k : i_neighbours) {
+            if (hasAngular) {
+                for (int kn = nbrIndptr[i]; kn < nbrIndptr[i+1]; ++kn) {
+                    int k = nbrIndices[kn];
                     if (k == i || k >= j) {
                         continue;
                     }
 
                     // Precompute some values that are used by both G4 and G5
-                    float r_ik = distances[i][k];
-                    float r_jk = distances[j][k];
+                    float dx_ik = xi - posX[k];
+                    float dy_ik = yi - posY[k];
+                    float dz_ik = zi - posZ[k];
+                    float r_ik = sqrt(dx_ik*dx_ik + dy_ik*dy_ik + dz_ik*dz_ik);
+                    float dx_jk = posX[j] - posX[k];
+                    float dy_jk = posY[j] - posY[k];
+                    float dz_jk = posZ[j] - posZ[k];
+                    float r_jk = sqrt(dx_jk*dx_jk + dy_jk*dy_jk + dz_jk*dz_jk);
                     float fc_ik = computeCutoff(r_ik);
                     float r_ij_square = r_ij*r_ij;
                     float r_ik_square = r_ik*r_ik;
@@ -118,14 +208,9 @@ vector<vector<float> > ACSF::create(vector<vector<float> > &positions, vector<in
                     float costheta = 0.5/(r_ij*r_ik) * (r_ij_square+r_ik_square-r_jk_square);
 
                     // Determine the location for this triplet of species
-                    int its;
-                    if (index_j >= index_k) {
-                        its = (index_j*(index_j+1))/2 + index_k;
-                    } else  {
-                        its = (index_k*(index_k+1))/2 + index_j;
-                    }
-                    offset = nTypes * (1+nG2+nG3);         // Skip this atoms G1 G2 and G3
-                    offset += its * (nG4+nG5);              // skip G4 and G5 types that are not the ones of atom bi
+                    int its = pairIndex[index_j*nTypes + index_k];
+                    offset = angularStart;                 // Skip this atoms G1 G2 and G3
+                    offset += its * nAngular;              // skip G4 and G5 types that are not the ones of atom bi
 
                     // Compute G4
                     computeG4(row, offset, costheta, r_jk, r_ij_square, r_ik_square, r_jk_square, fc_ij, fc_ik);
@@ -135,80 +220,71 @@ vector<vector<float> > ACSF::create(vector<vector<float> > &positions, vector<in
                 }
             }
         }
-        ++index;
     }
-
-    return output;
 }
 
 
 /*! \brief Computes the value of the cutoff fuction at a specific distance.
+ *
+ * The value is masked to zero beyond the cutoff radius with a select
+ * instead of a branch, so the callers can accumulate unconditionally and
+ * the surrounding loops stay free of data-dependent branches.
  * */
 inline float ACSF::computeCutoff(float r_ij) {
-	return 0.5*(cos(r_ij*PI/rCut)+1);
+	return r_ij <= rCut ? 0.5*(cos(r_ij*piOverRCut)+1) : 0;
 }
 
-inline void ACSF::computeG1(vector<float> &output, int &offset, float &fc_ij) {
+inline void ACSF::computeG1(float *output, int &offset, float &fc_ij) {
     output[offset] += fc_ij;
     offset += 1;
 }
 
-inline void ACSF::computeG2(vector<float> &output, int &offset, float &r_ij, float &fc_ij) {
+inline void ACSF::computeG2(float *output, int &offset, float &r_ij, float &fc_ij) {
 
 	// Compute G2 - gaussian types
-    float eta;
-    float Rs;
-	for (auto params : g2Params) {
-        eta = params[0];
-        Rs = params[1];
-        output[offset] += exp(-eta * (r_ij - Rs)*(r_ij - Rs)) * fc_ij;
+    const float *eta = g2Eta.data();
+    const float *Rs = g2Rs.data();
+	for (int m = 0; m < nG2; ++m) {
+        output[offset] += exp(-eta[m] * (r_ij - Rs[m])*(r_ij - Rs[m])) * fc_ij;
         offset++;
 	}
 }
 
-inline void ACSF::computeG3(vector<float> &output, int &offset, float &r_ij, float &fc_ij) {
+inline void ACSF::computeG3(float *output, int &offset, float &r_ij, float &fc_ij) {
 	// Compute G3 - cosine type
-	for (auto param : g3Params) {
+	for (const auto &param : g3Params) {
         output[offset] += cos(r_ij*param)*fc_ij;
         offset++;
     }
 }
 
-inline void ACSF::computeG4(vector<float> &output, int &offset, float &costheta, float &r_jk, float &r_ij_square, float &r_ik_square, float &r_jk_square, float &fc_ij, float &fc_ik) {
-	// Compute G4
-    if (r_jk > rCut) {
-        offset += g4Params.size();
-        return;
-    }
+inline void ACSF::computeG4(float *output, int &offset, float &costheta, float &r_jk, float &r_ij_square, float &r_ik_square, float &r_jk_square, float &fc_ij, float &fc_ik) {
+	// Compute G4. The masked cutoff value is zero whenever r_jk is beyond
+	// the cutoff radius, which zeroes the whole term without a separate
+	// range branch in the triplet loop.
     float cutoff_jk = computeCutoff(r_jk);
 	float fc4 = fc_ij*fc_ik*cutoff_jk;
-	float eta;
-	float zeta;
-	float lambda;
+	const float *eta = g4Eta.data();
+	const float *zeta = g4Zeta.data();
+	const float *lambda = g4Lambda.data();
 	float gauss;
-	for (auto params : g4Params) {
-		eta = params[0];
-		zeta = params[1];
-		lambda = params[2];
-		gauss = exp(-eta*(r_ij_square+r_ik_square+r_jk_square)) * fc4;
-		output[offset] += 2*pow(0.5*(1 + lambda*costheta), zeta) * gauss;
+	for (int m = 0; m < nG4; ++m) {
+		gauss = exp(-eta[m]*(r_ij_square+r_ik_square+r_jk_square)) * fc4;
+		output[offset] += 2*pow(0.5*(1 + lambda[m]*costheta), zeta[m]) * gauss;
 		offset++;
 	}
 }
 
-inline void ACSF::computeG5(vector<float> &output, int &offset, float &costheta, float &r_ij_square, float &r_ik_square, float &fc_ij, float &fc_ik) {
+inline void ACSF::computeG5(float *output, int &offset, float &costheta, float &r_ij_square, float &r_ik_square, float &fc_ij, float &fc_ik) {
 	// Compute G5
-	float eta;
-	float zeta;
-	float lambda;
+	const float *eta = g5Eta.data();
+	const float *zeta = g5Zeta.data();
+	const float *lambda = g5Lambda.data();
 	float gauss;
 	float fc5 = fc_ij*fc_ik;
-	for (auto params : g5Params) {
-		eta = params[0];
-		zeta = params[1];
-		lambda = params[2];
-		gauss = exp(-eta*(r_ij_square+r_ik_square)) * fc5;
-		output[offset] += 2*pow(0.5*(1 + lambda*costheta), zeta) * gauss;
+	for (int m = 0; m < nG5; ++m) {
+		gauss = exp(-eta[m]*(r_ij_square+r_ik_square)) * fc5;
+		output[offset] += 2*pow(0.5*(1 + lambda[m]*costheta), zeta[m]) * gauss;
 		offset++;
 	}
 }
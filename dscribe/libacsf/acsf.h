@@ -1,7 +1,7 @@
 #ifndef ACSF_H
 #define ACSF_H
 
-#include <unordered_map>
+#include <vector>
 
 #define PI 3.1415926535897932384626433832795028841971693993751058209749445923078164062
 
@@ -24,7 +24,7 @@ class ACSF {
             vector<int> atomicNumbers
         );
 
-        vector<vector<float> > create(vector<vector<float> > &positions, vector<int> &atomicNumbers, const vector<vector<float> > &distances, const vector<vector<int> > &neighbours, vector<int> &indices);
+        void create(float *out, const float *positions, int nAtoms, const int *atomicNumbers, const int *nbrIndices, const int *nbrIndptr, const int *indices, int nIndices);
         void setRCut(float rCut);
         void setG2Params(vector<vector<float> > g2Params);
         void setG3Params(vector<float> g3Params);
@@ -39,6 +39,7 @@ class ACSF {
         int nG4;
         int nG5;
         float rCut;
+        double piOverRCut;
         vector<vector<float> > g2Params;
         vector<float> g3Params;
         vector<vector<float> > g4Params;
@@ -47,12 +48,41 @@ class ACSF {
 
     private:
         float computeCutoff(float r_ij);
-        void computeG1(vector<float> &output, int &offset, float &fc_ij);
-        void computeG2(vector<float> &output, int &offset, float &r_ij, float &fc_ij);
-        void computeG3(vector<float> &output, int &offset, float &r_ij, float &fc_ij);
-        void computeG4(vector<float> &output, int &offset, float &costheta, float &r_jk, float &r_ij_square, float &r_ik_square, float &r_jk_square, float &fc_ij, float &fc_ik);
-        void computeG5(vector<float> &output, int &offset, float &costheta, float &r_ij_square, float &r_ik_square, float &fc_ij, float &fc_ik);
-        unordered_map<int, int> atomicNumberToIndexMap;
+        void computeG1(float *output, int &offset, float &fc_ij);
+        void computeG2(float *output, int &offset, float &r_ij, float &fc_ij);
+        void computeG3(float *output, int &offset, float &r_ij, float &fc_ij);
+        void computeG4(float *output, int &offset, float &costheta, float &r_jk, float &r_ij_square, float &r_ik_square, float &r_jk_square, float &fc_ij, float &fc_ik);
+        void computeG5(float *output, int &offset, float &costheta, float &r_ij_square, float &r_ik_square, float &fc_ij, float &fc_ik);
+
+        // The parameter sets are mirrored into flat structure-of-arrays form
+        // when they are set: the evaluators then read each parameter as a
+        // unit-stride stream instead of chasing one heap-allocated vector
+        // per parameter set.
+        vector<float> g2Eta;
+        vector<float> g2Rs;
+        vector<float> g4Eta;
+        vector<float> g4Zeta;
+        vector<float> g4Lambda;
+        vector<float> g5Eta;
+        vector<float> g5Zeta;
+        vector<float> g5Lambda;
+
+        // Maps an atomic number directly to the type index. A flat lookup
+        // table indexed by Z avoids the hashing cost of a map in the pair
+        // loops, and the 8-bit entries keep the whole table within a couple
+        // of cache lines (the number of types is bounded by the number of
+        // elements, so the indices always fit). Atomic numbers that are not
+        // part of the configured species map to -1; the caller is expected
+        // to have validated the system.
+        vector<signed char> atomicNumberToIndexMap;
+
+        // Maps an (unordered) pair of type indices to the index of the pair
+        // in the flattened output, with the pair (a, b) found at a*nTypes+b.
+        // The table replaces the triangular index arithmetic and its
+        // ordering branch in the triplet loop with a single load, and the
+        // 16-bit entries keep it small enough to stay in L1 even for systems
+        // covering most of the periodic table.
+        vector<short> typePairToIndexMap;
 };
 
 #endif
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Copyright 2019 DScribe developers
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import numpy as np
+
+
+def _pow(base, zeta):
+    """Raises the given array to the power zeta so that negative bases are
+    treated like C++ pow(): integral exponents are valid for negative bases,
+    whereas numpy would produce nan for any non-integer exponent dtype.
+    """
+    if float(zeta).is_integer():
+        return base ** int(zeta)
+    return base ** zeta
+
+
+class ACSFWrapper:
+    """Pure numpy implementation of the ACSF symmetry functions.
+
+    Mirrors the interface of the compiled extension
+    :class:`dscribe.libacsf.acsfwrapper.ACSFWrapper` and is used as a fallback
+    when the extension cannot be imported. The calculation is vectorized over
+    the neighbours of each center, but is still noticeably slower than the
+    C++ kernel and is not meant for production use.
+    """
+    def __init__(self):
+        self.rcut = 0.0
+        self.g2_params = []
+        self.g3_params = []
+        self.g4_params = []
+        self.g5_params = []
+        self.atomic_numbers = []
+
+    @property
+    def atomic_numbers(self):
+        return self._atomic_numbers
+
+    @atomic_numbers.setter
+    def atomic_numbers(self, value):
+        self._atomic_numbers = list(value)
+        self._type_index = {z: i for i, z in enumerate(self._atomic_numbers)}
+
+    @property
+    def n_types(self):
+        return len(self._atomic_numbers)
+
+    @property
+    def n_type_pairs(self):
+        return self.n_types * (self.n_types + 1) // 2
+
+    @property
+    def n_g2(self):
+        return len(self.g2_params)
+
+    @property
+    def n_g3(self):
+        return len(self.g3_params)
+
+    @property
+    def n_g4(self):
+        return len(self.g4_params)
+
+    @property
+    def n_g5(self):
+        return len(self.g5_params)
+
+    def create(self, positions, atomic_numbers, nbr_indices, nbr_indptr, indices):
+        """Calculates the symmetry function values for the given centers.
+
+        Args:
+            positions(np.ndarray): Atomic positions in transposed (3, n_atoms)
+                form.
+            atomic_numbers(np.ndarray): Atomic numbers for each atom.
+            nbr_indices(np.ndarray): Indices of the neighbours within the
+                cutoff radius in compressed sparse row form.
+            nbr_indptr(np.ndarray): Row pointers into nbr_indices: the
+                neighbours of atom i are
+                nbr_indices[nbr_indptr[i]:nbr_indptr[i + 1]].
+            indices(np.ndarray): Indices of the central atoms.
+
+        Returns:
+            np.ndarray: The symmetry function values with one row per center.
+        """
+        n_radial = 1 + self.n_g2 + self.n_g3
+        n_angular = self.n_g4 + self.n_g5
+        n_features = n_radial * self.n_types + n_angular * self.n_type_pairs
+        out = np.zeros((len(indices), n_features), dtype=np.float32)
+
+        positions = np.asarray(positions, dtype=np.float32)
+        atomic_numbers = np.asarray(atomic_numbers)
+        type_of = np.array([self._type_index[z] for z in atomic_numbers])
+        rcut = self.rcut
+
+        for index, i in enumerate(indices):
+            row = out[index]
+            js = nbr_indices[nbr_indptr[i]:nbr_indptr[i + 1]]
+            js = js[js != i]
+            if js.size == 0:
+                continue
+
+            # Radial terms, vectorized over the neighbours of this center
+            disp = positions[:, js] - positions[:, i:i + 1]
+            r_ij = np.sqrt(np.sum(disp ** 2, axis=0))
+            fc_ij = 0.5 * (np.cos(r_ij * np.pi / rcut) + 1)
+            offsets = type_of[js] * n_radial
+
+            np.add.at(row, offsets, fc_ij)
+            for i_g2, (eta, Rs) in enumerate(self.g2_params, start=1):
+                np.add.at(row, offsets + i_g2, np.exp(-eta * (r_ij - Rs) ** 2) * fc_ij)
+            for i_g3, kappa in enumerate(self.g3_params, start=1 + self.n_g2):
+                np.add.at(row, offsets + i_g3, np.cos(r_ij * kappa) * fc_ij)
+
+            # Angular terms, vectorized over the neighbour pairs
+            if n_angular == 0 or js.size < 2:
+                continue
+            a, b = np.triu_indices(js.size, k=1)
+            distinct = js[a] != js[b]
+            a = a[distinct]
+            b = b[distinct]
+            r_a = r_ij[a]
+            r_b = r_ij[b]
+            d_ab = positions[:, js[a]] - positions[:, js[b]]
+            r_ab = np.sqrt(np.sum(d_ab ** 2, axis=0))
+            fc_ab = fc_ij[a] * fc_ij[b]
+            r_a2 = r_a ** 2
+            r_b2 = r_b ** 2
+            r_ab2 = r_ab ** 2
+            costheta = 0.5 / (r_a * r_b) * (r_a2 + r_b2 - r_ab2)
+
+            # Locate the feature block of each symmetric pair of types
+            t_big = np.maximum(type_of[js[a]], type_of[js[b]])
+            t_small = np.minimum(type_of[js[a]], type_of[js[b]])
+            pair_index = t_big * (t_big + 1) // 2 + t_small
+            offsets = n_radial * self.n_types + pair_index * n_angular
+
+            within = r_ab <= rcut
+            fc4 = fc_ab * 0.5 * (np.cos(r_ab * np.pi / rcut) + 1)
+            for i_g4, (eta, zeta, lambda_) in enumerate(self.g4_params):
+                gauss = np.exp(-eta * (r_a2 + r_b2 + r_ab2)) * fc4
+                values = 2 * _pow(0.5 * (1 + lambda_ * costheta), zeta) * gauss
+                np.add.at(row, offsets[within] + i_g4, values[within])
+            for i_g5, (eta, zeta, lambda_) in enumerate(self.g5_params, start=self.n_g4):
+                gauss = np.exp(-eta * (r_a2 + r_b2)) * fc_ab
+                np.add.at(row, offsets + i_g5, 2 * _pow(0.5 * (1 + lambda_ * costheta), zeta) * gauss)
+
+        return out
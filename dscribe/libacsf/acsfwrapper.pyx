@@ -3,6 +3,7 @@
 import numpy as np
 from libcpp.vector cimport vector
 from acsf cimport ACSF
+from dscribe.utils.memory import aligned_zeros
 
 def rebuild(rcut, g2_params, g3_params, g4_params, g5_params, atomic_numbers):
     """Function for rebuilding an ACSFWrapper from serialized arguments.
@@ -30,8 +31,38 @@ cdef class ACSFWrapper:
         """
         return (rebuild, (self.rcut, self.g2_params, self.g3_params, self.g4_params, self.g5_params, self.atomic_numbers))
 
-    def create(self, vector[vector[float]] positions, vector[int] atomic_numbers, vector[vector[float]]  distances, vector[vector[int]] neighbours, vector[int] indices):
-        return np.array(self.thisptr.create(positions, atomic_numbers, distances, neighbours, indices), dtype=np.float32)
+    def create(self, float[:, ::1] positions, int[::1] atomic_numbers, int[::1] nbr_indices, int[::1] nbr_indptr, int[::1] indices):
+        """Expects the positions in transposed (3, n_atoms) form: with this
+        layout each cartesian component is a contiguous stream in memory,
+        which the C++ kernel can read with unit stride. The neighbours are
+        given in compressed sparse row form as two int32 arrays. All inputs
+        are shared with C++ as raw pointers without copying.
+        """
+        # The output is written directly into a zero-initialized numpy array.
+        # This avoids allocating an intermediate nested vector in C++ and
+        # copying it afterwards.
+        cdef int n_indices = indices.shape[0]
+        cdef int n_atoms = positions.shape[1]
+        n_features = (1 + self.thisptr.nG2 + self.thisptr.nG3) * self.thisptr.nTypes \
+            + (self.thisptr.nG4 + self.thisptr.nG5) * self.thisptr.nTypePairs
+        # The buffer starts on a cache-line boundary, which the C++ kernel
+        # asserts to the compiler.
+        out = aligned_zeros((n_indices, n_features), dtype=np.float32)
+        cdef float[:, ::1] out_view = out
+        cdef float *out_ptr
+        cdef const float *positions_ptr
+        cdef const int *nbr_indices_ptr = NULL
+        if nbr_indices.shape[0] != 0:
+            nbr_indices_ptr = &nbr_indices[0]
+        if n_indices != 0:
+            out_ptr = &out_view[0, 0]
+            positions_ptr = &positions[0, 0]
+            # The kernel only touches the C-level buffers, so the GIL can be
+            # released for the duration of the call. This allows the
+            # calculation of multiple systems to scale across a thread pool.
+            with nogil:
+                self.thisptr.create(out_ptr, positions_ptr, n_atoms, &atomic_numbers[0], nbr_indices_ptr, &nbr_indptr[0], &indices[0], n_indices)
+        return out
 
     @property
     def rcut(self):
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Copyright 2019 DScribe developers
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import numpy as np
+
+
+def aligned_empty(shape, dtype=np.float64, alignment=64):
+    """Allocates an uninitialized array whose data starts on an aligned
+    address. Plain numpy allocations only guarantee 16-byte alignment,
+    whereas the default of 64 bytes here aligns the data to cache-line
+    boundaries, which allows aligned SIMD loads in the C extensions that the
+    array is shared with.
+
+    Args:
+        shape(tuple of ints): Shape of the array.
+        dtype(np.dtype): The data type of the array.
+        alignment(int): The address alignment of the first element in bytes.
+
+    Returns:
+        np.ndarray: An uninitialized C-contiguous array with the given shape
+        and data type, with the data aligned to the given boundary.
+    """
+    dtype = np.dtype(dtype)
+    n_bytes = int(np.prod(shape)) * dtype.itemsize
+    buffer = np.empty(n_bytes + alignment, dtype=np.uint8)
+    offset = (-buffer.ctypes.data) % alignment
+    return buffer[offset:offset + n_bytes].view(dtype).reshape(shape)
+
+
+def aligned_zeros(shape, dtype=np.float64, alignment=64):
+    """Allocates a zero-initialized array whose data starts on an aligned
+    address. See :func:`aligned_empty` for details.
+
+    Args:
+        shape(tuple of ints): Shape of the array.
+        dtype(np.dtype): The data type of the array.
+        alignment(int): The address alignment of the first element in bytes.
+
+    Returns:
+        np.ndarray: A zeroed C-contiguous array with the given shape and data
+        type, with the data aligned to the given boundary.
+    """
+    array = aligned_empty(shape, dtype, alignment)
+    array.fill(0)
+    return array
@@ -427,6 +427,37 @@ class ACSFTests(TestBaseClass, unittest.TestCase):
         dot2 = np.dot(vec3, vec4)
         self.assertTrue(abs(dot1-dot2) < 1e-8)
 
+    def test_numpy_fallback(self):
+        """Tests that the pure numpy fallback implementation gives the same
+        output as the compiled extension.
+        """
+        from dscribe.libacsf.acsffallback import ACSFWrapper as PythonACSFWrapper
+
+        samples = [molecule("CH3OH"), molecule("H2O2")]
+        desc = ACSF(
+            rcut=6.0,
+            species=["H", "C", "O"],
+            g2_params=[[1, 2], [4, 5]],
+            g3_params=[1, 2, 3, 4],
+            g4_params=[[0.005, 2, 1], [0.005, 4, -1]],
+            g5_params=[[0.005, 2, 1], [0.005, 4, -1]],
+        )
+        expected = [desc.create(system) for system in samples]
+
+        # Swap in the fallback wrapper and reapply the setup
+        desc.acsf_wrapper = PythonACSFWrapper()
+        desc.species = ["H", "C", "O"]
+        desc.g2_params = [[1, 2], [4, 5]]
+        desc.g3_params = [1, 2, 3, 4]
+        desc.g4_params = [[0.005, 2, 1], [0.005, 4, -1]]
+        desc.g5_params = [[0.005, 2, 1], [0.005, 4, -1]]
+        desc.rcut = 6.0
+
+        for system, i_expected in zip(samples, expected):
+            i_feat = desc.create(system)
+            self.assertEqual(i_feat.dtype, i_expected.dtype)
+            self.assertTrue(np.allclose(i_feat, i_expected, rtol=1e-5, atol=1e-7))
+
     def test_unit_cells(self):
         """Tests if arbitrary unit cells are accepted.
         """